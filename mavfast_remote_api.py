@@ -6,38 +6,88 @@ Designed for Railway/Render deployment (free tier compatible).
 """
 
 import os
+
+# Make blocking I/O (Selenium, Sheets, requests) cooperative under gunicorn's gevent workers.
+# Must run before anything imports socket/ssl; the RQ worker opts out via GEVENT_PATCH=false.
+if os.environ.get('GEVENT_PATCH', 'true').lower() == 'true':
+    from gevent import monkey
+    monkey.patch_all()
+
 import sys
-import json
+import atexit
+import functools
 import logging
+import math
+from logging.handlers import QueueHandler, QueueListener
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Any, Optional, Union
 import traceback
 from pathlib import Path
 
 from flask import Flask, request, jsonify, Response
+from cachetools import TTLCache
+import fastjsonschema
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+import orjson
+import psutil
 import requests
+from requests.adapters import HTTPAdapter
+from selectolax.lexbor import LexborHTMLParser
+from redis import Redis
+from rq import Queue, get_current_job
+from rq.exceptions import NoSuchJobError
+from rq.job import Job
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
 import gspread
+from gspread.utils import a1_to_rowcol, rowcol_to_a1
 from google.oauth2.service_account import Credentials
 
 # Add Brighton Best automation modules to path
 current_dir = Path(__file__).parent
 sys.path.append(str(current_dir))
 
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson for faster (de)serialization of large quotes"""
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app)
 
-# Configure logging
+# Configure logging; records are enqueued on the request path and written by a background listener
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+log_handlers = [logging.StreamHandler()]
+if os.path.exists('/tmp'):
+    log_handlers.append(logging.FileHandler('/tmp/mavfast_api.log'))
+for log_handler in log_handlers:
+    log_handler.setFormatter(log_formatter)
+
+log_queue = queue.Queue(-1)
+log_listener = QueueListener(log_queue, *log_handlers, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+# The listener's handlers do the formatting; the queue handler only passes the message through
+queue_handler = QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter('%(message)s'))
 logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('/tmp/mavfast_api.log') if os.path.exists('/tmp') else logging.StreamHandler()
-    ]
+    level=os.environ.get('LOG_LEVEL', 'WARNING').upper(),
+    handlers=[queue_handler]
 )
 logger = logging.getLogger(__name__)
 
@@ -50,47 +100,352 @@ class Config:
     USER_ID = os.environ.get('USER_ID', 'STEPHEN') 
     PASSWORD = os.environ.get('PASSWORD', 'stephen99')
     
+    # Brighton Best endpoints; 'http' drives them directly, 'selenium' falls back to the browser,
+    # 'mock' returns placeholder prices without contacting Brighton Best
+    BRIGHTON_TRANSPORT = os.environ.get('BRIGHTON_TRANSPORT', 'http').lower()
+    BRIGHTON_LOGIN_URL = os.environ.get('BRIGHTON_LOGIN_URL', 'https://brightonbest.com/login')
+    BRIGHTON_QUOTE_URL = os.environ.get('BRIGHTON_QUOTE_URL', 'https://brightonbest.com/quote')
+    HTTP_TIMEOUT = int(os.environ.get('HTTP_TIMEOUT', 30))
+    
+    # Recently scraped part prices are reused for this long (seconds)
+    PRICE_CACHE_TTL = int(os.environ.get('PRICE_CACHE_TTL', 900))
+    PRICE_CACHE_SIZE = int(os.environ.get('PRICE_CACHE_SIZE', 10000))
+    
     # Google Sheets configuration
     GOOGLE_SHEETS_CREDENTIALS = os.environ.get('GOOGLE_SHEETS_CREDENTIALS', '')
     INPUT_SHEET_ID = os.environ.get('INPUT_SHEET_ID', '15pzfwd0ii_ySdlWT_8RYSf7a5piDN0PSIaU49Capc58')
     OUTPUT_SHEET_ID = os.environ.get('OUTPUT_SHEET_ID', '15pzfwd0ii_ySdlWT_8RYSf7a5piDN0PSIaU49Capc58')
     
+    # Output sheet layout: rows are matched on the quote ID and part number columns, and the six
+    # result values (unit price, total, description, availability, warehouse, Dallas flag) are
+    # written starting at the result column. Writes stay off until the layout is confirmed.
+    OUTPUT_QUOTE_ID_COLUMN = os.environ.get('OUTPUT_QUOTE_ID_COLUMN', 'A')
+    OUTPUT_PART_NUMBER_COLUMN = os.environ.get('OUTPUT_PART_NUMBER_COLUMN', 'B')
+    OUTPUT_RESULT_START_COLUMN = os.environ.get('OUTPUT_RESULT_START_COLUMN', 'C')
+    OUTPUT_SHEET_LAYOUT_CONFIRMED = os.environ.get('OUTPUT_SHEET_LAYOUT_CONFIRMED', 'False').lower() == 'true'
+    
     # Chrome/Selenium configuration for cloud deployment
     CHROME_BIN = os.environ.get('CHROME_BIN', '/usr/bin/chromium-browser')
     CHROMEDRIVER_PATH = os.environ.get('CHROMEDRIVER_PATH', '/usr/bin/chromedriver')
+    DRIVER_MAX_USES = int(os.environ.get('DRIVER_MAX_USES', 50))
+    # Unique (USS) memory of one driver's process tree; a fresh headless Chrome is roughly 150-250 MB
+    DRIVER_MAX_MEMORY_MB = int(os.environ.get('DRIVER_MAX_MEMORY_MB', 400))
+    DRIVER_POOL_SIZE = int(os.environ.get('DRIVER_POOL_SIZE', 4))
+    # Drivers launched at startup (selenium transport only, and only in processes that scrape)
+    DRIVER_PREWARM = int(os.environ.get('DRIVER_PREWARM', 2))
+    DRIVER_ACQUIRE_TIMEOUT = int(os.environ.get('DRIVER_ACQUIRE_TIMEOUT', 120))
+    ELEMENT_WAIT_TIMEOUT = int(os.environ.get('ELEMENT_WAIT_TIMEOUT', 5))
+    CONNECTION_POOL_MAXSIZE = int(os.environ.get('CONNECTION_POOL_MAXSIZE', 20))
+    
+    # Deployment region; keep it close to Brighton Best's US origin (Railway us-east4 / Render ohio)
+    # since every scrape round-trip is bounded by RTT to brightonbest.com
+    DEPLOY_REGION = os.environ.get('DEPLOY_REGION', 'us-east4')
+    RUNTIME_REGION = os.environ.get('RAILWAY_REPLICA_REGION', '')
     
     # API configuration
     PORT = int(os.environ.get('PORT', 5000))
+    # Responses with at least this many pricing rows (~1MB) are streamed instead of built in memory
+    STREAM_MIN_ROWS = int(os.environ.get('STREAM_MIN_ROWS', 4000))
     DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
     
+    # Background job queue (jobs run synchronously when unset)
+    REDIS_URL = os.environ.get('REDIS_URL', '')
+    JOB_QUEUE_NAME = os.environ.get('JOB_QUEUE_NAME', 'brighton')
+    JOB_RESULT_TTL = int(os.environ.get('JOB_RESULT_TTL', 3600))
+    JOB_TIMEOUT = int(os.environ.get('JOB_TIMEOUT', 600))
+    RQ_WORKER = os.environ.get('RQ_WORKER', 'false').lower() == 'true'  # Set by worker.py
+    
     # Webhook/notification URLs
     N8N_WEBHOOK_URL = os.environ.get('N8N_WEBHOOK_URL', '')
     SLACK_WEBHOOK_URL = os.environ.get('SLACK_WEBHOOK_URL', '')
 
 config = Config()
 
+if config.RUNTIME_REGION and not config.RUNTIME_REGION.startswith(config.DEPLOY_REGION):
+    logger.warning(f"⚠️ Running in region {config.RUNTIME_REGION}, expected {config.DEPLOY_REGION}; "
+                   f"Brighton Best latency will be higher")
+
+# Sub-resources Chrome never needs to fetch for scraping (blocked via CDP)
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg',
+    '*.woff', '*.woff2', '*.ttf', '*.css', '*.mp4',
+    '*google-analytics*', '*doubleclick*'
+]
+
+GOOGLE_SHEETS_SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive'
+]
+
+@functools.lru_cache(maxsize=1)
+def get_sheets_client() -> gspread.Client:
+    """Parse the service-account credentials and authorize gspread once per process"""
+    # Parse credentials from environment variable (JSON string)
+    creds_data = orjson.loads(config.GOOGLE_SHEETS_CREDENTIALS)
+    credentials = Credentials.from_service_account_info(creds_data, scopes=GOOGLE_SHEETS_SCOPES)
+    client = gspread.authorize(credentials)
+    # Allow concurrent Sheets calls to share keep-alive connections instead of recycling one
+    client.session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=config.CONNECTION_POOL_MAXSIZE))
+    return client
+
+class PriceCache:
+    """TTL cache of per-part pricing, shared across requests"""
+    
+    # Only quantity-independent fields are cached; totals are recomputed per quote
+    FIELDS = ('unit_price', 'description', 'availability', 'warehouse_location', 'is_dallas_stock')
+    
+    def __init__(self, maxsize: int, ttl: int):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, part_number: str) -> Optional[Dict]:
+        with self._lock:
+            fields = self._cache.get(str(part_number))
+            if fields is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return fields
+    
+    def store(self, pricing_data: List[Dict]):
+        with self._lock:
+            for item in pricing_data:
+                self._cache[str(item['part_number'])] = {field: item[field] for field in self.FIELDS}
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._cache)}
+
+price_cache = PriceCache(config.PRICE_CACHE_SIZE, config.PRICE_CACHE_TTL)
+
+class BrightonScrapeError(Exception):
+    """Raised when Brighton Best rejects the login or returns no usable pricing"""
+
+class DriverUnavailableError(Exception):
+    """Raised when no Chrome WebDriver could be obtained from the pool"""
+
+class DriverPool:
+    """Bounded pool of warm Chrome WebDriver sessions shared across requests"""
+    
+    # Unresponsive drivers tolerated per checkout before giving up
+    MAX_ACQUIRE_ATTEMPTS = 3
+    
+    def __init__(self, factory: Callable[[], Optional[webdriver.Chrome]], size: int, max_uses: int,
+                 max_memory_mb: int):
+        self._factory = factory
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.max_memory = max_memory_mb * 1024 * 1024
+        self._idle = queue.Queue()
+        self._uses = {}
+        self._drivers = {}
+        self._closed = False
+        self._starting = 0
+        self.prewarm_started = False
+        self.prewarm_error = None
+        self.warmed = False  # Set once any driver has launched successfully
+        self._lock = threading.Lock()
+    
+    @property
+    def idle(self) -> int:
+        """Number of warm drivers waiting to be checked out"""
+        return self._idle.qsize()
+    
+    @property
+    def live(self) -> int:
+        """Number of drivers currently running, idle or checked out"""
+        with self._lock:
+            return len(self._uses)
+    
+    def prewarm(self, k: int):
+        """Launch up to k drivers in a background thread so first requests skip the cold start"""
+        def warm():
+            launched = sum(1 for _ in range(k) if self._replenish())
+            if not launched and not self.warmed:
+                self.prewarm_error = 'Chrome WebDriver failed to launch during pre-warm'
+                logger.error(f"❌ {self.prewarm_error}")
+            else:
+                logger.warning(f"🔥 Pre-warm finished: {launched}/{k} Chrome WebDriver(s) ready")
+        
+        self.prewarm_started = True
+        threading.Thread(target=warm, daemon=True).start()
+    
+    def acquire(self, timeout: float = None) -> webdriver.Chrome:
+        """Check out a live driver, building a new one while the pool is below capacity"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        for _ in range(self.MAX_ACQUIRE_ATTEMPTS):
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                remaining = max(0, deadline - time.monotonic()) if deadline is not None else None
+                driver = self._create() or self._wait_for_idle(remaining)
+            
+            try:
+                driver.title  # Probe the session; raises if Chrome has died
+                return driver
+            except Exception:
+                logger.warning("⚠️ Pooled Chrome WebDriver is unresponsive, rebuilding")
+                self._discard(driver)
+            
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+        
+        raise DriverUnavailableError('No responsive Chrome WebDriver available')
+    
+    def release(self, driver: webdriver.Chrome, healthy: bool = True):
+        """Return a driver to the pool, recycling it on error, after too many uses or when bloated"""
+        if self._closed:
+            self._discard(driver)
+            return
+        
+        with self._lock:
+            self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+            uses = self._uses[id(driver)]
+        
+        reason = None
+        if not healthy:
+            reason = 'request failed'
+        elif uses >= self.max_uses:
+            reason = f'{uses} uses (limit {self.max_uses})'
+        else:
+            memory = self._memory_usage(driver)
+            if memory >= self.max_memory:
+                reason = f'USS {memory // (1024 * 1024)} MB (limit {self.max_memory // (1024 * 1024)} MB)'
+        
+        if reason is None:
+            try:
+                # Clear session state so the next request starts clean
+                driver.delete_all_cookies()
+                driver.get('about:blank')
+                self._idle.put(driver)
+                return
+            except Exception:
+                reason = 'session reset failed'
+        
+        # WARNING so recycle reasons show at the default production log level and the limits can be tuned
+        logger.warning(f"♻️ Recycling Chrome WebDriver: {reason}")
+        
+        # Quit the old driver and build its replacement off the request path
+        threading.Thread(target=self._recycle, args=(driver,), daemon=True).start()
+    
+    def _recycle(self, driver: webdriver.Chrome):
+        """Quit a retired driver, then launch a fresh one into the idle queue"""
+        self._discard(driver)
+        self._replenish()
+    
+    def _memory_usage(self, driver: webdriver.Chrome) -> int:
+        """Unique memory (USS) of chromedriver and the Chrome processes it spawned, in bytes
+        
+        USS excludes pages shared between Chrome's processes, which summed RSS would count repeatedly.
+        """
+        try:
+            process = psutil.Process(driver.service.process.pid)
+            processes = [process] + process.children(recursive=True)
+        except (AttributeError, psutil.Error):
+            return 0
+        
+        total = 0
+        for proc in processes:
+            try:
+                total += proc.memory_full_info().uss
+            except psutil.Error:
+                pass  # Process exited or is not readable
+        return total
+    
+    def _replenish(self) -> bool:
+        """Add a fresh driver to the idle queue if the pool has room; True if one was added"""
+        try:
+            driver = self._create()
+        except DriverUnavailableError as e:
+            logger.error(f"❌ Background driver rebuild failed: {e}")
+            return False
+        if not driver:
+            return False
+        if self._closed:
+            self._discard(driver)
+            return False
+        self._idle.put(driver)
+        return True
+    
+    def _create(self) -> Optional[webdriver.Chrome]:
+        """Build a new driver if capacity allows, otherwise return None"""
+        with self._lock:
+            if len(self._uses) + self._starting >= self.size:
+                return None
+            # Reserve the slot before the (slow) browser launch
+            self._starting += 1
+        
+        driver = None
+        try:
+            driver = self._factory()
+        finally:
+            with self._lock:
+                self._starting -= 1
+                if driver:
+                    self._uses[id(driver)] = 0
+                    self._drivers[id(driver)] = driver
+                    self.warmed = True
+        
+        if not driver:
+            raise DriverUnavailableError('Failed to initialize Chrome WebDriver')
+        return driver
+    
+    def _wait_for_idle(self, timeout: float = None) -> webdriver.Chrome:
+        """Block until another request releases a driver"""
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise DriverUnavailableError('Timed out waiting for a free Chrome WebDriver')
+    
+    def close(self):
+        """Quit every driver the pool started so Chrome isn't orphaned when the process exits"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        with self._lock:
+            drivers = list(self._drivers.values())
+        for driver in drivers:
+            self._discard(driver)
+    
+    def _discard(self, driver: webdriver.Chrome):
+        """Quit a driver and free its pool slot"""
+        with self._lock:
+            self._uses.pop(id(driver), None)
+            self._drivers.pop(id(driver), None)
+        try:
+            driver.quit()
+            logger.info("🔒 Chrome WebDriver closed")
+        except Exception:
+            pass
+
 class RemoteBrightonAutomation:
     """Brighton Best automation adapted for cloud deployment"""
     
     def __init__(self):
-        self.driver = None
         self.sheets_client = None
+        self._sheet = None
+        # Connection pool shared by the per-request HTTP sessions
+        self.http_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10)
+        self._pool = DriverPool(self.setup_chrome_driver, config.DRIVER_POOL_SIZE, config.DRIVER_MAX_USES,
+                                config.DRIVER_MAX_MEMORY_MB)
         self.setup_google_sheets()
     
+    def prewarm(self, k: int = 2):
+        """Start launching k browser sessions ahead of the first request"""
+        logger.warning(f"🔥 Pre-warming {k} Chrome WebDriver(s)")
+        self._pool.prewarm(k)
+    
     def setup_google_sheets(self):
         """Initialize Google Sheets client from environment variable"""
         try:
             if config.GOOGLE_SHEETS_CREDENTIALS:
-                # Parse credentials from environment variable (JSON string)
-                creds_data = json.loads(config.GOOGLE_SHEETS_CREDENTIALS)
-                credentials = Credentials.from_service_account_info(
-                    creds_data,
-                    scopes=[
-                        'https://www.googleapis.com/auth/spreadsheets',
-                        'https://www.googleapis.com/auth/drive'
-                    ]
-                )
-                self.sheets_client = gspread.authorize(credentials)
+                # Reuses the process-wide authorized client (and its keep-alive session)
+                self.sheets_client = get_sheets_client()
                 logger.info("✅ Google Sheets client initialized")
             else:
                 logger.warning("⚠️ No Google Sheets credentials provided")
@@ -98,11 +453,22 @@ class RemoteBrightonAutomation:
             logger.error(f"❌ Google Sheets setup failed: {e}")
             self.sheets_client = None
     
-    def setup_chrome_driver(self):
+    def new_http_session(self) -> requests.Session:
+        """Create an HTTP session with its own cookie jar on top of the shared keep-alive pool"""
+        # Not closed after use: Session.close() would also close the shared adapter
+        session = requests.Session()
+        session.mount('https://', self.http_adapter)
+        session.headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        return session
+    
+    def setup_chrome_driver(self) -> Optional[webdriver.Chrome]:
         """Initialize Chrome WebDriver for cloud deployment"""
         try:
             chrome_options = Options()
             
+            # Return from driver.get() on DOMContentLoaded instead of waiting for every sub-resource
+            chrome_options.page_load_strategy = 'eager'
+            
             # Cloud-friendly Chrome options
             chrome_options.add_argument('--headless')
             chrome_options.add_argument('--no-sandbox')
@@ -111,9 +477,9 @@ class RemoteBrightonAutomation:
             chrome_options.add_argument('--window-size=1920,1080')
             chrome_options.add_argument('--disable-extensions')
             chrome_options.add_argument('--disable-plugins')
-            chrome_options.add_argument('--disable-images')
             chrome_options.add_argument('--disable-javascript')
             chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+            chrome_options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
             
             # Set Chrome binary location for cloud platforms
             if config.CHROME_BIN and os.path.exists(config.CHROME_BIN):
@@ -122,19 +488,30 @@ class RemoteBrightonAutomation:
             # Initialize WebDriver
             if config.CHROMEDRIVER_PATH and os.path.exists(config.CHROMEDRIVER_PATH):
                 service = Service(config.CHROMEDRIVER_PATH)
-                self.driver = webdriver.Chrome(service=service, options=chrome_options)
+                driver = webdriver.Chrome(service=service, options=chrome_options)
             else:
                 # Try default Chrome driver
-                self.driver = webdriver.Chrome(options=chrome_options)
+                driver = webdriver.Chrome(options=chrome_options)
+            
+            # Selenium's chromedriver client keeps a single pooled connection by default;
+            # widen it so concurrent commands don't serialize or churn connections
+            conn = getattr(driver.command_executor, '_conn', None)
+            if conn is not None:
+                conn.connection_pool_kw.update(maxsize=config.CONNECTION_POOL_MAXSIZE, block=False)
+                conn.clear()
+            
+            # Block images, fonts, CSS and trackers at the network layer
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
             
             logger.info("✅ Chrome WebDriver initialized for cloud deployment")
-            return True
+            return driver
             
         except Exception as e:
             logger.error(f"❌ Chrome WebDriver setup failed: {e}")
             logger.error(f"Chrome binary: {config.CHROME_BIN}")
             logger.error(f"ChromeDriver path: {config.CHROMEDRIVER_PATH}")
-            return False
+            return None
     
     def process_brighton_automation(self, quote_data: Dict) -> Dict:
         """Execute Brighton Best automation for the provided quote data"""
@@ -153,14 +530,6 @@ class RemoteBrightonAutomation:
                     'quote_id': quote_id
                 }
             
-            # Setup browser
-            if not self.setup_chrome_driver():
-                return {
-                    'success': False,
-                    'error': 'Failed to initialize Chrome WebDriver',
-                    'quote_id': quote_id
-                }
-            
             # Brighton Best login and processing
             result = self.run_brighton_workflow(quote_data)
             
@@ -178,6 +547,14 @@ class RemoteBrightonAutomation:
             logger.info(f"✅ Brighton Best automation completed for {quote_id}")
             return result
             
+        except DriverUnavailableError as e:
+            logger.error(f"❌ {e}")
+            return {
+                'success': False,
+                'error': str(e),
+                'quote_id': quote_id
+            }
+            
         except Exception as e:
             error_msg = f"Brighton Best automation failed: {str(e)}"
             logger.error(f"❌ {error_msg}")
@@ -190,14 +567,6 @@ class RemoteBrightonAutomation:
                 'processing_time_seconds': (datetime.now() - start_time).total_seconds(),
                 'processed_at': datetime.now().isoformat()
             }
-        
-        finally:
-            if self.driver:
-                try:
-                    self.driver.quit()
-                    logger.info("🔒 Chrome WebDriver closed")
-                except:
-                    pass
     
     def run_brighton_workflow(self, quote_data: Dict) -> Dict:
         """Execute the core Brighton Best workflow (adapted from your existing scripts)"""
@@ -205,43 +574,206 @@ class RemoteBrightonAutomation:
         quote_id = quote_data['quote_id']
         parts = quote_data['parts_requested']
         
-        logger.info(f"Processing {len(parts)} parts for quote {quote_id}")
-        
         try:
-            # Step 1: Navigate to Brighton Best and login
-            self.driver.get('https://brightonbest.com/login')
+            # Only go to Brighton Best for parts without a fresh cached price
+            known = {}
+            missing = []
+            for part in parts:
+                fields = price_cache.get(part['part_number'])
+                if fields is None:
+                    missing.append(part)
+                else:
+                    known[str(part['part_number'])] = fields
             
-            # Add your existing login logic here
-            # This would use your proven login methods from enhanced_scraper.py
+            logger.info(f"Processing {len(parts)} parts for quote {quote_id} ({len(parts) - len(missing)} cached)")
             
-            # Step 2: Create new quote
-            # Your existing quote creation logic
+            # Reflect what actually happened against Brighton Best; all cache hits means no login at all
+            contacted = bool(missing) and config.BRIGHTON_TRANSPORT != 'mock'
+            session_info = {
+                'login_successful': contacted,
+                'quote_submitted': contacted,
+                'data_extracted': contacted,
+                'cached_parts': len(parts) - len(missing)
+            }
             
-            # Step 3: Submit parts using bulk paste method
-            # Your proven bulk paste logic from enhanced_scraper.py
+            if missing:
+                # Raises on a failed login or submission, so reaching here means all steps worked
+                scraped = self._scrape_parts(missing)
+                # Only prices actually parsed from Brighton Best are cached, never placeholders
+                if config.BRIGHTON_TRANSPORT != 'mock':
+                    price_cache.store(scraped)
+                for item in scraped:
+                    known[str(item['part_number'])] = item
             
-            # Step 4: Extract pricing and location data
-            # Your existing scraping methods
+            # Rebuild rows in request order with quantity-dependent totals for this quote
+            pricing_data = []
+            missing_parts = []
+            for part in parts:
+                fields = known.get(str(part['part_number']))
+                if fields is None:
+                    missing_parts.append(part['part_number'])
+                    continue
+                row = {'part_number': part['part_number'], 'quantity': part['quantity']}
+                row.update({field: fields[field] for field in PriceCache.FIELDS})
+                row['total_price'] = part['quantity'] * row['unit_price']
+                pricing_data.append(row)
             
-            # For now, return mock data (replace with actual scraping results)
-            mock_results = self.generate_mock_results(parts, quote_id)
+            if not pricing_data:
+                raise BrightonScrapeError('No pricing found on Brighton Best for any requested part')
+            if missing_parts:
+                logger.warning(f"⚠️ {len(missing_parts)} part(s) not found on Brighton Best for {quote_id}: {missing_parts}")
             
-            return mock_results
+            return self.summarize_results(parts, pricing_data, quote_id, missing_parts, session_info)
             
+        except DriverUnavailableError:
+            raise
         except Exception as e:
             raise Exception(f"Brighton Best workflow failed: {str(e)}")
     
-    def generate_mock_results(self, parts: List[Dict], quote_id: str) -> Dict:
-        """Generate mock results for testing (replace with actual scraping)"""
+    def _scrape_parts(self, parts: List[Dict]) -> List[Dict]:
+        """Fetch pricing rows for the given parts using the configured transport"""
+        
+        if config.BRIGHTON_TRANSPORT == 'mock':
+            logger.warning(f"⚠️ BRIGHTON_TRANSPORT=mock, returning placeholder prices for {len(parts)} parts")
+            return self.generate_mock_results(parts)
+        
+        if config.BRIGHTON_TRANSPORT == 'http':
+            logger.info(f"Scraping {len(parts)} parts over HTTP")
+            return self._scrape_via_http(parts)
+        
+        # Shard parts across up to DRIVER_POOL_SIZE browser sessions to overlap network round-trips
+        workers = min(len(parts), self._pool.size)
+        chunk_size = -(-len(parts) // workers)
+        chunks = [parts[i:i + chunk_size] for i in range(0, len(parts), chunk_size)]
+        
+        logger.info(f"Scraping {len(parts)} parts across {len(chunks)} browser session(s)")
+        
+        with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+            chunk_results = executor.map(self._run_chunk, chunks)
+            return [item for chunk_data in chunk_results for item in chunk_data]
+    
+    def _scrape_via_http(self, parts: List[Dict]) -> List[Dict]:
+        """Login and submit all parts with plain HTTP requests, no browser involved"""
+        
+        # Each request logs in on its own cookie jar so concurrent quotes can't clobber each other's session
+        http = self.new_http_session()
+        
+        # Step 1: Login
+        response = http.post(config.BRIGHTON_LOGIN_URL, data={
+            'company_id': config.COMPANY_ID,
+            'user_id': config.USER_ID,
+            'password': config.PASSWORD
+        }, timeout=config.HTTP_TIMEOUT)
+        response.raise_for_status()
+        if self.is_login_page(response.content):
+            raise BrightonScrapeError('Brighton Best login failed')
+        
+        # Step 2 & 3: Create the quote and submit every part in a single bulk paste
+        response = http.post(config.BRIGHTON_QUOTE_URL, data={'parts': self.build_bulk_paste(parts)},
+                             timeout=config.HTTP_TIMEOUT)
+        response.raise_for_status()
+        
+        # Step 4: Extract pricing and location data
+        return self.parse_pricing_html(response.content, parts)
+    
+    def is_login_page(self, content: Union[str, bytes]) -> bool:
+        """A page that still asks for a password means the login did not take"""
+        return LexborHTMLParser(content).css_first('input[type="password"]') is not None
+    
+    def build_bulk_paste(self, parts: List[Dict]) -> str:
+        """Format parts as the tab-separated lines Brighton Best's bulk paste box accepts"""
+        return '\n'.join(f"{part['part_number']}\t{part['quantity']}" for part in parts)
+    
+    def parse_pricing_html(self, content: Union[str, bytes], parts: List[Dict]) -> List[Dict]:
+        """Build pricing rows from a Brighton Best quote results page (parsed once, in C)"""
+        
+        quantities = {str(part['part_number']): part['quantity'] for part in parts}
+        pricing_data = []
+        
+        for row in LexborHTMLParser(content).css('tr.price-row'):
+            def cell(name):
+                found = row.css_first(f'.{name}')
+                return found.text(strip=True) if found else ''
+            
+            part_number = cell('pn')
+            if part_number not in quantities:
+                continue
+            
+            # Blank or non-numeric prices ("Call", "N/A") count as not found, so the part is reported missing and never cached
+            try:
+                unit_price = float(cell('price').lstrip('$').replace(',', ''))
+            except ValueError:
+                logger.warning(f"⚠️ No usable price for {part_number}: {cell('price')!r}")
+                continue
+            if not math.isfinite(unit_price):
+                continue
+            
+            quantity = quantities[part_number]
+            warehouse = cell('loc').upper()
+            pricing_data.append({
+                'part_number': part_number,
+                'quantity': quantity,
+                'unit_price': unit_price,
+                'total_price': quantity * unit_price,
+                'description': cell('desc'),
+                'availability': cell('avail'),
+                'warehouse_location': warehouse,
+                'is_dallas_stock': warehouse == 'DALLAS'
+            })
+        
+        return pricing_data
+    
+    def _run_chunk(self, chunk: List[Dict]) -> List[Dict]:
+        """Scrape one chunk of parts on a driver checked out from the pool"""
+        driver = self._pool.acquire(timeout=config.DRIVER_ACQUIRE_TIMEOUT)
+        healthy = False
+        try:
+            pricing_data = self._scrape_chunk(driver, chunk)
+            healthy = True
+            return pricing_data
+        finally:
+            self._pool.release(driver, healthy=healthy)
+    
+    def _scrape_chunk(self, driver: webdriver.Chrome, chunk: List[Dict]) -> List[Dict]:
+        """Run login, quote submission and extraction for a chunk of parts in one browser session"""
+        
+        # Wait on the specific element each step needs rather than on the whole page
+        wait = WebDriverWait(driver, config.ELEMENT_WAIT_TIMEOUT, poll_frequency=0.1)
+        
+        # Step 1: Navigate to Brighton Best and login
+        driver.get(config.BRIGHTON_LOGIN_URL)
+        wait.until(EC.presence_of_element_located((By.ID, 'company_id'))).send_keys(config.COMPANY_ID)
+        driver.find_element(By.ID, 'user_id').send_keys(config.USER_ID)
+        driver.find_element(By.ID, 'password').send_keys(config.PASSWORD)
+        login_button = wait.until(EC.element_to_be_clickable((By.ID, 'loginBtn')))
+        login_button.click()
+        # Let the login POST complete (and set the session cookie) before navigating away
+        wait.until(EC.staleness_of(login_button))
+        if driver.find_elements(By.CSS_SELECTOR, 'input[type="password"]'):
+            raise BrightonScrapeError('Brighton Best login failed')
+        
+        # Step 2: Create new quote
+        driver.get(config.BRIGHTON_QUOTE_URL)
+        
+        # Step 3: Submit parts using bulk paste method, one send_keys and one click for the whole chunk
+        bulk_paste = wait.until(EC.presence_of_element_located((By.ID, 'bulkPaste')))
+        bulk_paste.send_keys(self.build_bulk_paste(chunk))
+        wait.until(EC.element_to_be_clickable((By.ID, 'bulkSubmit'))).click()
+        wait.until(EC.staleness_of(bulk_paste))
+        
+        # Step 4: Extract pricing and location data from a single page snapshot,
+        # instead of re-querying the browser for every part
+        return self.parse_pricing_html(driver.page_source, chunk)
+    
+    def generate_mock_results(self, parts: List[Dict]) -> List[Dict]:
+        """Generate mock pricing rows for testing (BRIGHTON_TRANSPORT=mock)"""
         
-        total_material_cost = 0
         pricing_data = []
         
         for part in parts:
             # Mock pricing calculation
             unit_price = 0.5529  # Replace with actual scraped price
             total_price = part['quantity'] * unit_price
-            total_material_cost += total_price
             
             pricing_data.append({
                 'part_number': part['part_number'],
@@ -254,60 +786,203 @@ class RemoteBrightonAutomation:
                 'is_dallas_stock': True
             })
         
+        return pricing_data
+    
+    def summarize_results(self, parts: List[Dict], pricing_data: List[Dict], quote_id: str,
+                          missing_parts: List[Any], session_info: Dict) -> Dict:
+        """Compute quote totals from the pricing rows actually found"""
+        
+        total_material_cost = 0
+        dallas_items = 0
+        
+        # Single pass over the rows for all totals
+        for item in pricing_data:
+            total_material_cost += item['total_price']
+            if item['is_dallas_stock']:
+                dallas_items += 1
+        
         # Mock freight calculation (Dallas = $0, Non-Dallas = $20 per item)
-        total_freight = sum(20.0 if not item['is_dallas_stock'] else 0.0 for item in pricing_data)
-        dallas_items = sum(1 for item in pricing_data if item['is_dallas_stock'])
+        total_freight = 20.0 * (len(pricing_data) - dallas_items)
         
         return {
             'success': True,
             'quote_id': quote_id,
-            'parts_processed': len(parts),
+            'parts_requested': len(parts),
+            'parts_processed': len(pricing_data),
+            'missing_parts': missing_parts,
             'pricing_data': pricing_data,
             'total_material_cost': total_material_cost,
             'total_freight': total_freight,
             'total_quote_value': total_material_cost + total_freight,
-            'availability_rate': 100.0,  # Mock 100% availability
+            # Share of requested parts Brighton Best returned pricing for
+            'availability_rate': (len(pricing_data) / len(parts)) * 100 if parts else 0.0,
             'dallas_items': dallas_items,
-            'dallas_percentage': (dallas_items / len(parts)) * 100,
-            'processing_notes': 'Mock processing completed successfully',
-            'brighton_session_info': {
-                'login_successful': True,
-                'quote_submitted': True,
-                'data_extracted': True
-            }
+            'dallas_percentage': (dallas_items / len(pricing_data)) * 100 if pricing_data else 0.0,
+            'processing_notes': self._processing_notes(missing_parts),
+            'brighton_session_info': session_info
         }
     
+    def _processing_notes(self, missing_parts: List[Any]) -> str:
+        """Human-readable summary of how the quote was processed"""
+        notes = ('Mock processing completed successfully' if config.BRIGHTON_TRANSPORT == 'mock'
+                 else 'Processing completed successfully')
+        if missing_parts:
+            notes += f"; {len(missing_parts)} part(s) not found, totals exclude them"
+        return notes
+    
     def update_sheets_with_results(self, quote_data: Dict, results: Dict):
-        """Update Google Sheets with Brighton Best results"""
+        """Update Google Sheets with Brighton Best results
+        
+        Matches rows on OUTPUT_QUOTE_ID_COLUMN / OUTPUT_PART_NUMBER_COLUMN and overwrites six cells
+        from OUTPUT_RESULT_START_COLUMN. Skipped unless OUTPUT_SHEET_LAYOUT_CONFIRMED is set, since
+        the output sheet defaults to the same spreadsheet as the input sheet.
+        """
         try:
             if not self.sheets_client:
                 logger.warning("No Google Sheets client available")
                 return
+            
+            if not config.OUTPUT_SHEET_LAYOUT_CONFIRMED:
+                logger.warning("⚠️ Output sheet layout not confirmed (OUTPUT_SHEET_LAYOUT_CONFIRMED), skipping Sheets update")
+                return
                 
-            # Open the sheet
-            sheet = self.sheets_client.open_by_key(config.OUTPUT_SHEET_ID).sheet1
+            # Open the sheet once and reuse the handle
+            if self._sheet is None:
+                self._sheet = self.sheets_client.open_by_key(config.OUTPUT_SHEET_ID).sheet1
+            sheet = self._sheet
             
-            # Find rows with matching quote ID and update pricing data
+            # Find rows with matching quote ID and part number in one read
             quote_id = quote_data['quote_id']
+            quote_col = config.OUTPUT_QUOTE_ID_COLUMN
+            part_col = config.OUTPUT_PART_NUMBER_COLUMN
+            quote_ids, part_numbers = sheet.batch_get([f'{quote_col}:{quote_col}', f'{part_col}:{part_col}'])
+            first_col = a1_to_rowcol(f'{config.OUTPUT_RESULT_START_COLUMN}1')[1]
+            pricing_by_part = {str(item['part_number']): item for item in results.get('pricing_data', [])}
+            
+            data = []
+            for row, (row_quote, row_part) in enumerate(zip(quote_ids, part_numbers), start=1):
+                if not row_quote or not row_part or row_quote[0] != quote_id:
+                    continue
+                item = pricing_by_part.get(str(row_part[0]))
+                if not item:
+                    continue
+                start = rowcol_to_a1(row, first_col)
+                end = rowcol_to_a1(row, first_col + 5)
+                data.append({
+                    'range': f"'{sheet.title}'!{start}:{end}",
+                    'values': [[
+                        item['unit_price'],
+                        item['total_price'],
+                        item['description'],
+                        item['availability'],
+                        item['warehouse_location'],
+                        item['is_dallas_stock']
+                    ]]
+                })
+            
+            if not data:
+                logger.warning(f"⚠️ No sheet rows found for quote {quote_id}")
+                return
             
-            # Your existing sheet update logic would go here
-            logger.info(f"✅ Google Sheets updated for quote {quote_id}")
+            # Write all rows for the quote in a single API call to stay under the write quota
+            sheet.spreadsheet.values_batch_update({'valueInputOption': 'RAW', 'data': data})
+            logger.info(f"✅ Google Sheets updated for quote {quote_id} ({len(data)} rows)")
             
         except Exception as e:
             logger.error(f"❌ Failed to update Google Sheets: {e}")
 
 # Initialize automation handler
 automation_handler = RemoteBrightonAutomation()
+atexit.register(automation_handler._pool.close)
+
+# Initialize background job queue
+redis_conn = Redis.from_url(config.REDIS_URL) if config.REDIS_URL else None
+job_queue = Queue(config.JOB_QUEUE_NAME, connection=redis_conn) if redis_conn else None
+
+# Warm browsers only where scraping happens: the RQ worker, or the web process when there is no queue
+if config.BRIGHTON_TRANSPORT == 'selenium' and config.DRIVER_PREWARM > 0 and (job_queue is None or config.RQ_WORKER):
+    automation_handler.prewarm(k=config.DRIVER_PREWARM)
+
+def run_automation_job(quote_data: Dict) -> Dict:
+    """Background job: run the automation and post the result to the n8n webhook"""
+    result = automation_handler.process_brighton_automation(quote_data)
+    
+    job = get_current_job()
+    if job:
+        result['job_id'] = job.id
+    
+    if config.N8N_WEBHOOK_URL:
+        try:
+            response = requests.post(config.N8N_WEBHOOK_URL, json=result, timeout=10)
+            response.raise_for_status()
+            logger.info(f"📨 Results posted to n8n webhook for quote {result.get('quote_id')}")
+        except requests.RequestException as e:
+            logger.error(f"❌ Failed to post results to n8n webhook: {e}")
+    
+    return result
+
+# Compiled once so malformed quotes are rejected before any browser/HTTP work
+validate_quote_data = fastjsonschema.compile({
+    'type': 'object',
+    'required': ['quote_id', 'parts_requested'],
+    'properties': {
+        'quote_id': {'type': 'string', 'minLength': 1},
+        'parts_requested': {
+            'type': 'array',
+            'minItems': 1,
+            'items': {
+                'type': 'object',
+                'required': ['part_number', 'quantity'],
+                'properties': {
+                    'part_number': {'type': ['string', 'integer']},
+                    'quantity': {'type': 'integer', 'minimum': 1}
+                }
+            }
+        }
+    }
+})
+
+def stream_json_response(result: Dict, status_code: int) -> Response:
+    """Stream a result dict as JSON, serializing pricing rows one at a time"""
+    
+    def generate():
+        yield b'{'
+        for key, value in result.items():
+            if key != 'pricing_data':
+                yield orjson.dumps(key) + b':' + orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS) + b','
+        yield b'"pricing_data":['
+        for index, item in enumerate(result.get('pricing_data', [])):
+            yield (b',' if index else b'') + orjson.dumps(item)
+        yield b']}'
+    
+    return Response(generate(), mimetype='application/json', status=status_code)
 
 @app.route('/', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
+    pool = automation_handler._pool
+    
+    # When pre-warming, hold back traffic only until the first browser has launched
+    if not pool.prewarm_started or pool.warmed:
+        status = 'healthy'
+    elif pool.prewarm_error:
+        status = 'unhealthy'
+    else:
+        status = 'warming'
+    
+    response = {
+        'status': status,
         'service': 'MavFast Brighton Best API',
         'timestamp': datetime.now().isoformat(),
-        'version': '1.0'
-    })
+        'version': '1.0',
+        'pool_ready': pool.idle,
+        'pool_size': pool.live,
+        'price_cache': price_cache.stats()
+    }
+    if status == 'unhealthy':
+        response['error'] = pool.prewarm_error
+    
+    return jsonify(response), 200 if status == 'healthy' else 503
 
 @app.route('/api/brighton-automation', methods=['POST'])
 def trigger_brighton_automation():
@@ -315,7 +990,15 @@ def trigger_brighton_automation():
     
     try:
         # Parse request data
-        request_data = request.get_json()
+        raw_data = request.get_data()
+        if not raw_data:
+            return jsonify({'success': False, 'error': 'No JSON data provided'}), 400
+        try:
+            request_data = orjson.loads(raw_data)
+        except orjson.JSONDecodeError as e:
+            return jsonify({'success': False, 'error': f'Invalid JSON: {e}'}), 400
+        if not isinstance(request_data, dict):
+            return jsonify({'success': False, 'error': 'Request body must be a JSON object'}), 400
         if not request_data:
             return jsonify({'success': False, 'error': 'No JSON data provided'}), 400
         
@@ -323,13 +1006,33 @@ def trigger_brighton_automation():
         if not quote_data:
             return jsonify({'success': False, 'error': 'No quote_data provided'}), 400
         
+        try:
+            validate_quote_data(quote_data)
+        except fastjsonschema.JsonSchemaException as e:
+            return jsonify({'success': False, 'error': f'Invalid quote_data: {e.message}'}), 400
+        
         logger.info(f"🎯 Brighton automation request received for quote: {quote_data.get('quote_id', 'UNKNOWN')}")
         
+        # Hand off to the background worker; results are delivered to the n8n webhook
+        if job_queue is not None:
+            # Enqueue by import path: RQ rejects functions from __main__ (e.g. under the dev server)
+            job = job_queue.enqueue('mavfast_remote_api.run_automation_job', quote_data,
+                                    result_ttl=config.JOB_RESULT_TTL, job_timeout=config.JOB_TIMEOUT)
+            logger.info(f"📥 Queued job {job.id} for quote: {quote_data.get('quote_id', 'UNKNOWN')}")
+            return jsonify({
+                'success': True,
+                'job_id': job.id,
+                'status': job.get_status(),
+                'quote_id': quote_data.get('quote_id', 'UNKNOWN')
+            }), 202
+        
         # Process the automation
         result = automation_handler.process_brighton_automation(quote_data)
         
         # Return results
         status_code = 200 if result.get('success') else 500
+        if len(result.get('pricing_data', [])) >= config.STREAM_MIN_ROWS:
+            return stream_json_response(result, status_code)
         return jsonify(result), status_code
         
     except Exception as e:
@@ -341,6 +1044,26 @@ def trigger_brighton_automation():
         logger.error(f"❌ API error: {e}")
         return jsonify(error_response), 500
 
+@app.route('/api/job/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Polling endpoint for queued Brighton Best automation jobs"""
+    
+    if redis_conn is None:
+        return jsonify({'success': False, 'error': 'Job queue not configured'}), 404
+    
+    try:
+        job = Job.fetch(job_id, connection=redis_conn)
+    except NoSuchJobError:
+        return jsonify({'success': False, 'error': f'Job {job_id} not found'}), 404
+    
+    return jsonify({
+        'job_id': job.id,
+        'status': job.get_status(),
+        'enqueued_at': job.enqueued_at.isoformat() if job.enqueued_at else None,
+        'ended_at': job.ended_at.isoformat() if job.ended_at else None,
+        'result': job.return_value()
+    })
+
 @app.route('/api/test', methods=['GET', 'POST'])
 def test_endpoint():
     """Test endpoint for debugging"""
@@ -372,6 +1095,8 @@ def test_endpoint():
             'test_data': test_quote_data,
             'config': {
                 'company_id': config.COMPANY_ID,
+                'deploy_region': config.DEPLOY_REGION,
+                'runtime_region': config.RUNTIME_REGION,
                 'chrome_bin': config.CHROME_BIN,
                 'chromedriver_path': config.CHROMEDRIVER_PATH,
                 'has_sheets_client': automation_handler.sheets_client is not None
@@ -390,7 +1115,12 @@ if __name__ == '__main__':
     logger.info("🚀 Starting MavFast Brighton Best API")
     logger.info(f"Port: {config.PORT}")
     logger.info(f"Debug: {config.DEBUG}")
+    logger.info(f"Region: {config.RUNTIME_REGION or 'unknown'} (expected {config.DEPLOY_REGION})")
     logger.info(f"Chrome Binary: {config.CHROME_BIN}")
     logger.info(f"ChromeDriver: {config.CHROMEDRIVER_PATH}")
     
-    app.run(host='0.0.0.0', port=config.PORT, debug=config.DEBUG)
\ No newline at end of file
+    # Production traffic is served by gunicorn (see Procfile); the dev server is for local debugging only
+    if config.DEBUG:
+        app.run(host='0.0.0.0', port=config.PORT, debug=config.DEBUG)
+    else:
+        logger.warning("⚠️ DEBUG is off; run under gunicorn: gunicorn -k gevent mavfast_remote_api:app")
\ No newline at end of file
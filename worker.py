@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+MavFast RQ worker
+Imports the API module before listening so Chrome drivers are pre-warmed at startup,
+not when the first job is dequeued.
+"""
+
+import os
+
+# Must be set before the API module is imported
+os.environ.setdefault('RQ_WORKER', 'true')
+os.environ.setdefault('GEVENT_PATCH', 'false')
+
+from rq.worker import SimpleWorker
+
+import mavfast_remote_api as api
+
+if __name__ == '__main__':
+    if api.job_queue is None:
+        raise SystemExit('REDIS_URL is not set; nothing to work on')
+    
+    api.logger.info(f"🚀 Starting MavFast worker on queue: {api.config.JOB_QUEUE_NAME}")
+    # SimpleWorker runs jobs in this process, so the warm driver pool is shared across jobs
+    SimpleWorker([api.job_queue], connection=api.redis_conn).work()